@@ -6,21 +6,29 @@ import textwrap
 
 # local extensions
 sys.path.insert(0, str(pathlib.Path(__file__).parent / 'extensions'))
+# So that local extensions can import repo tooling like ls.py in-process
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / '.scripts'))
 local_extensions = ['generate_tables', 'interface_docs', 'package_docs', 'diataxis_docs_fallback']
 
 # So that sphinx.ext.autodoc can find charmlibs code
 root = pathlib.Path(__file__).parent.parent
-package_glob = '[a-z]*'
+
+
+def _package_dirs(directory, exclude=''):
+    # a single scandir pass, where is_dir uses the cached entry type instead of another stat
+    with os.scandir(directory) as entries:
+        return [
+            e.path
+            for e in entries
+            if 'a' <= e.name[0] <= 'z' and e.name != exclude and e.is_dir(follow_symlinks=False)
+        ]
+
+
 sys.path[0:0] = [
+    *(os.path.join(p, 'src', 'charmlibs') for p in _package_dirs(root, exclude='interfaces')),
     *(
-        str(p / 'src' / 'charmlibs')
-        for p in root.glob(package_glob)
-        if p.is_dir() and not p.name == 'interfaces'
-    ),
-    *(
-        str(p / 'src' / 'charmlibs' / 'interfaces')
-        for p in (root / 'interfaces').glob(package_glob)
-        if p.is_dir()
+        os.path.join(p, 'src', 'charmlibs', 'interfaces')
+        for p in _package_dirs(root / 'interfaces')
     ),
 ]
 
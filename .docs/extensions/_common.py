@@ -0,0 +1,99 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers shared by the local Sphinx extensions.
+
+This module is not a Sphinx extension itself, so it isn't listed in ``local_extensions``.
+"""
+
+from __future__ import annotations
+
+import functools
+import mmap
+import os
+import typing
+
+import _files
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+_MMAP_THRESHOLD = 16 * 1024
+
+
+def ls_paths(
+    root: pathlib.Path,
+    category: str,
+    include_examples: bool = False,
+    include_placeholders: bool = False,
+    include_testing: bool = False,
+) -> list[str]:
+    """Return package or interface paths from ``ls.py``.
+
+    The result is memoized on the listing of the directories that ``ls.py`` searches.
+    """
+    # listdir order is arbitrary, so use sets rather than sorting for a stable cache key
+    listing = (frozenset(os.listdir(root)), frozenset(os.listdir(root / 'interfaces')))
+    return _ls_paths(listing, category, include_examples, include_placeholders, include_testing)
+
+
+@functools.cache
+def _ls_paths(
+    listing: tuple[frozenset[str], frozenset[str]],
+    category: str,
+    include_examples: bool,
+    include_placeholders: bool,
+    include_testing: bool,
+) -> list[str]:
+    del listing  # only used as the cache key
+    # Import here, so that scripts using the other helpers don't need ls.py's dependencies.
+    import ls
+
+    return ls.paths(
+        category,
+        include_examples=include_examples,
+        include_placeholders=include_placeholders,
+        include_testing=include_testing,
+    )
+
+
+def write_if_needed(path: pathlib.Path, content: str) -> None:
+    """Write to path only if contents are different.
+
+    This allows sphinx-build to skip rebuilding pages that depend on the output of the extensions
+    if the output hasn't actually changed.
+    """
+    data = content.encode()
+    if not _has_contents(path, data):
+        _files.write_atomically(path, data)
+
+
+def _has_contents(path: pathlib.Path, data: bytes) -> bool:
+    """Return whether the file at path exists and contains exactly data.
+
+    Sizes are compared first, so that a changed file usually doesn't need to be read. Large files
+    are read through a memory map rather than buffered reads.
+    """
+    try:
+        f = path.open('rb')
+    except FileNotFoundError:
+        return False
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size != len(data):
+            return False
+        if size < _MMAP_THRESHOLD:
+            return f.read() == data
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:] == data
@@ -35,7 +35,7 @@ if typing.TYPE_CHECKING:
 def setup(app: sphinx.application.Sphinx) -> dict[str, str | bool]:
     """Sphinx extension entrypoint — registers the fallback hook."""
     app.connect('builder-inited', _fallback)
-    return {'version': '2.0.0', 'parallel_read_safe': False, 'parallel_write_safe': False}
+    return {'version': '2.0.0', 'parallel_read_safe': True, 'parallel_write_safe': True}
 
 
 def _fallback(app: sphinx.application.Sphinx) -> None:
@@ -43,4 +43,4 @@ def _fallback(app: sphinx.application.Sphinx) -> None:
     for category in 'tutorials', 'how-to', 'explanation':
         path = docs_dir / category / f'_lib-{category}.md'
         if not path.exists():
-            path.write_text('')
+            path.write_bytes(b'')
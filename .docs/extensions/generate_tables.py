@@ -22,6 +22,7 @@ import pathlib
 import typing
 from xml.etree import ElementTree
 
+import _common
 import yaml
 
 ####################
@@ -37,7 +38,7 @@ if typing.TYPE_CHECKING:
 def setup(app: sphinx.application.Sphinx) -> dict[str, str | bool]:
     """Entrypoint for Sphinx extensions, connects generation code to Sphinx event."""
     app.connect('builder-inited', _generate)
-    return {'version': '1.0.0', 'parallel_read_safe': False, 'parallel_write_safe': False}
+    return {'version': '1.0.0', 'parallel_read_safe': True, 'parallel_write_safe': True}
 
 
 def _generate(app: sphinx.application.Sphinx):
@@ -210,14 +211,8 @@ def _generate_libs_tables(docs_dir: str | pathlib.Path) -> None:
 
 
 def _write_if_needed(path: pathlib.Path, content: str) -> None:
-    """Write to path only if contents are different.
-
-    This allows sphinx-build to skip rebuilding pages that depend on the output of this extension
-    if the output hasn't actually changed.
-    """
-    to_write = _FILE_HEADER + content
-    if not path.exists() or path.read_text() != to_write:
-        path.write_text(to_write)
+    """Write content with the generated file header to path, only if contents are different."""
+    _common.write_if_needed(path, _FILE_HEADER + content)
 
 
 def _load_tag_descriptions(reference_dir: pathlib.Path) -> dict[str, str]:
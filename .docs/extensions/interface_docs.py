@@ -16,12 +16,15 @@
 
 from __future__ import annotations
 
-import json
+import concurrent.futures
+import fnmatch
+import os
 import pathlib
 import re
-import subprocess
 import typing
 
+import _common
+
 ####################
 # Sphinx extension #
 ####################
@@ -33,7 +36,7 @@ if typing.TYPE_CHECKING:
 def setup(app: sphinx.application.Sphinx) -> dict[str, str | bool]:
     """Entrypoint for Sphinx extensions, connects generation code to Sphinx event."""
     app.connect('builder-inited', _interface_docs)
-    return {'version': '1.0.0', 'parallel_read_safe': False, 'parallel_write_safe': False}
+    return {'version': '1.0.0', 'parallel_read_safe': True, 'parallel_write_safe': True}
 
 
 def _interface_docs(app: sphinx.application.Sphinx) -> None:
@@ -42,7 +45,9 @@ def _interface_docs(app: sphinx.application.Sphinx) -> None:
         # But we need to make sure something is there so that the TOC glob doesn't fail.
         ref_dir = pathlib.Path(app.confdir, 'reference', 'interfaces')
         ref_dir.mkdir(parents=True, exist_ok=True)
-        _write_if_needed(path=ref_dir / 'placeholder.md', content='# Temporary TOC placeholder')
+        _common.write_if_needed(
+            path=ref_dir / 'placeholder.md', content='# Temporary TOC placeholder'
+        )
         return
     _main(docs_dir=pathlib.Path(app.confdir))
 
@@ -64,6 +69,11 @@ INDEX_TEMPLATE = """
 ```
 """.strip()
 REPO_MAIN_URL = 'https://github.com/canonical/charmlibs/blob/main'
+# matches all non-http(s) markdown links, where the link text may contain escaped characters
+# and one level of brackets, as in [a [b] c](x) or an image badge like [![x](img)](url)
+RELATIVE_LINK_PATTERN = re.compile(
+    r'\[((?:\\.|[^\[\]\\]|\[(?:\\.|[^\[\]\\])*\])+)\]\((?!https?://)([^)]+)\)'
+)
 
 
 def _main(docs_dir: pathlib.Path) -> None:
@@ -72,34 +82,39 @@ def _main(docs_dir: pathlib.Path) -> None:
     ref_dir = docs_dir / 'reference' / 'interfaces'
     ref_dir.mkdir(parents=True, exist_ok=True)
     (ref_dir / 'placeholder.md').unlink(missing_ok=True)
-    cmd = [root / '.scripts/ls.py', 'interfaces', '--exclude-examples', '--exclude-placeholders']
-    interfaces = json.loads(subprocess.check_output(cmd, text=True))
-    for path_str in interfaces:
-        interface_dir = root / path_str
-        interface_name = interface_dir.name
+    existing = set(os.listdir(ref_dir))  # one listing instead of a mkdir attempt per interface
+    indexes: list[tuple[pathlib.Path, str]] = []
+    readmes: list[tuple[pathlib.Path, pathlib.Path, str, str]] = []
+    for path_str in _common.ls_paths(root, 'interfaces'):
+        interface_name = path_str.rpartition('/')[2]
         interface_ref_dir = ref_dir / interface_name
-        interface_ref_dir.mkdir(exist_ok=True)
+        if interface_name not in existing:
+            interface_ref_dir.mkdir()
         label = f'interfaces-{interface_name.replace("_", "-")}'
         index = INDEX_TEMPLATE.format(label=label, interface_name=interface_name)
-        _write_if_needed(path=ref_dir / f'{interface_name}.md', content=index)
-        for v in (interface_dir / 'interface').glob('v[0-9]*'):
-            readme_raw = (v / 'README.md').read_text()
-            base_url = f'{REPO_MAIN_URL}/interfaces/{interface_name}/interface/{v.name}'
-            # match all non-http(s) markdown links and prepend base_url to matching links
-            readme = re.sub(
-                r'\[(.+)\]\((?!https?://)([^)]+)\)',
-                lambda m: f'[{m.group(1)}]({base_url}/{m.group(2)})',  # noqa: B023
-                readme_raw,
-            )
-            content = f'({label}-{v.name})=\n' + readme
-            _write_if_needed(path=interface_ref_dir / f'{v.name}.md', content=content)
-
-
-def _write_if_needed(path: pathlib.Path, content: str) -> None:
-    """Write to path only if contents are different.
-
-    This allows sphinx-build to skip rebuilding pages that depend on the output of this extension
-    if the output hasn't actually changed.
-    """
-    if not path.exists() or path.read_text() != content:
-        path.write_text(content)
+        indexes.append((ref_dir / f'{interface_name}.md', index))
+        # scandir names rather than globbing, to avoid a Path per entry in the interface dir
+        with os.scandir(os.path.join(root, path_str, 'interface')) as entries:
+            versions = [e.name for e in entries if fnmatch.fnmatchcase(e.name, 'v[0-9]*')]
+        for v in versions:
+            base_url = f'{REPO_MAIN_URL}/interfaces/{interface_name}/interface/{v}'
+            source = root / path_str / 'interface' / v / 'README.md'
+            target = interface_ref_dir / f'{v}.md'
+            readmes.append((source, target, f'{label}-{v}', base_url))
+    # Everything to write is collected first, then written in one phase.
+    # Reading and writing dominates, so threads can overlap the I/O for each file.
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [executor.submit(_common.write_if_needed, *args) for args in indexes]
+        futures.extend(executor.submit(_write_readme, *args) for args in readmes)
+        for future in futures:
+            future.result()  # re-raise any errors
+
+
+def _write_readme(source: pathlib.Path, target: pathlib.Path, label: str, base_url: str) -> None:
+    """Write the README to target with a MyST label, making relative links absolute."""
+    readme = source.read_text()
+    if '](' in readme:  # only run the regex if there could be any links
+        # prepend base_url to relative links, using a template rather than a Python callback
+        readme = RELATIVE_LINK_PATTERN.sub(rf'[\1]({base_url}/\2)', readme)
+    content = f'({label})=\n' + readme
+    _common.write_if_needed(path=target, content=content)
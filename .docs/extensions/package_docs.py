@@ -23,18 +23,23 @@ saved information when doctrees are resolved.
 
 from __future__ import annotations
 
+import functools
 import json
 import pathlib
 import pickle  # noqa: S403
 import re
-import subprocess
 import typing
 
+import _common
+import _files
+
 ####################
 # Sphinx extension #
 ####################
 
 if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
     import docutils.nodes
     import sphinx.application
 
@@ -45,7 +50,9 @@ def setup(app: sphinx.application.Sphinx) -> dict[str, str | bool]:
     app.connect('doctree-read', _load_on_doctree_read)
     app.connect('doctree-resolved', _save_on_doctree_resolved)
     app.add_config_value('package', default=None, rebuild='')
-    return {'version': '1.0.0', 'parallel_read_safe': False, 'parallel_write_safe': False}
+    # Restored domain data and TOCs are keyed by docname, so Sphinx merges them from parallel
+    # readers, and each saved doctree is written to its own file.
+    return {'version': '1.0.0', 'parallel_read_safe': True, 'parallel_write_safe': True}
 
 
 def _package_docs(app: sphinx.application.Sphinx) -> None:
@@ -56,9 +63,11 @@ def _load_on_doctree_read(app: sphinx.application.Sphinx, doctree: docutils.node
     """Load pickle file named after docname if it exists, and replace doctree contents in-place."""
     if app.config.package is not None:  # only load when not building docs for a specific package
         return
-    if not (source := pathlib.Path('.save', f'{app.env.docname}.pickle')).exists():
+    try:  # most documents have nothing saved, so just try the read rather than stat first
+        data = pathlib.Path('.save', f'{app.env.docname}.pickle').read_bytes()
+    except FileNotFoundError:
         return
-    saved, objects, modules, toc, toc_num_entries = pickle.loads(source.read_bytes())  # noqa: S301
+    saved, objects, modules, toc, toc_num_entries = pickle.loads(data)  # noqa: S301
     # restore saved doctree
     doctree.clear()
     for node in saved.children:
@@ -79,7 +88,7 @@ def _save_on_doctree_resolved(
     package = app.config.package
     # only save when building docs for a specific package
     # only save package reference docs
-    if package is None or docname != f'reference/charmlibs/{_normalize(package)}':
+    if package is None or docname != _reference_docname(package):
         return
     objects = app.env.domains['py'].data['objects']
     modules = app.env.domains['py'].data['modules']
@@ -87,14 +96,30 @@ def _save_on_doctree_resolved(
     toc_num_entries = app.env.toc_num_entries[docname]
     target = pathlib.Path('.save', f'{docname}.pickle')
     target.parent.mkdir(exist_ok=True, parents=True)
-    target.write_bytes(pickle.dumps((doctree, objects, modules, toc, toc_num_entries)))
+    data = (doctree, objects, modules, toc, toc_num_entries)
+    # Detach the build environment and reporters like Sphinx does when pickling doctrees, so they
+    # aren't dragged into the pickle along with the streams the reporters hold, but restore them
+    # afterwards since the builder still has to write this doc.
+    settings = doctree.settings
+    detached = (settings.env, getattr(settings, 'reporter', None), doctree.reporter)
+    settings.env = settings.reporter = doctree.reporter = None
+    try:
+        target.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    finally:
+        settings.env, settings.reporter, doctree.reporter = detached
 
 
 ####################
 # generation logic #
 ####################
 
-RST_TEMPLATE = """
+# runs of characters that PyPI name normalization replaces with a single '-'
+NAME_SEPARATOR_PATTERN = re.compile(r'[-_.]+')
+
+
+def _render(import_prefix: str, import_name: str, underline: str, label: str) -> str:
+    """Return the reference page for a package, without the automodule directive."""
+    return f"""
 .. raw:: html
 
    <style>
@@ -108,20 +133,44 @@ RST_TEMPLATE = """
 {import_name}
 {underline}
 """.strip()
-AUTOMODULE_TEMPLATE = """
 
-.. automodule:: {package}
-""".rstrip()
+
+def _render_with_automodule(
+    import_prefix: str, import_name: str, underline: str, label: str
+) -> str:
+    """Return the reference page for a package, including the automodule directive."""
+    page = _render(import_prefix, import_name, underline, label)
+    return f'{page}\n\n.. automodule:: {import_name}'
 
 
 def _main(docs_dir: pathlib.Path, package: str | None) -> None:
     """Write automodule file for package and placeholders rst files for all other packages."""
     root = docs_dir.parent
     ref_dir = docs_dir / 'reference'
-    (ref_dir / 'charmlibs' / 'interfaces').mkdir(parents=True, exist_ok=True)
-    ls = root / '.scripts' / 'ls.py'
-    cmd = [ls, 'packages', '--exclude-examples', '--exclude-placeholders', '--exclude-testing']
-    packages = json.loads(subprocess.check_output(cmd, text=True))
+    out_dir = ref_dir / 'charmlibs'
+    # not in out_dir, since writing the stamp would then count as a change to out_dir
+    stamp_path = ref_dir / '.package-docs-stamp'
+    # whether a directory is listed as a package depends on its pyproject.toml
+    pyproject_tomls = sorted([
+        *root.glob('*/pyproject.toml'),
+        *root.glob('interfaces/*/pyproject.toml'),
+    ])
+    watched = (
+        pathlib.Path(__file__),  # the page templates
+        root / '.scripts' / 'ls.py',
+        root,
+        root / 'interfaces',
+        *pyproject_tomls,
+        out_dir,
+        out_dir / 'interfaces',
+    )
+    pyproject_toml_names = [p.relative_to(root).as_posix() for p in pyproject_tomls]
+    stamp = _load_stamp(stamp_path, watched=watched, pyproject_tomls=pyproject_toml_names)
+    if stamp is not None and stamp['package'] == package:
+        return
+    # Per-package passes run in separate processes, so reuse the package list between them.
+    packages = stamp['packages'] if stamp is not None else _common.ls_paths(root, 'packages')
+    (out_dir / 'interfaces').mkdir(parents=True, exist_ok=True)
     for raw_package in packages:
         subdir, _, p = raw_package.rpartition('/')
         canonical_path = ['charmlibs']
@@ -129,31 +178,65 @@ def _main(docs_dir: pathlib.Path, package: str | None) -> None:
             canonical_path.append(_normalize(subdir))
         canonical_path.append(_normalize(p))
         *import_prefix_parts, import_name = (part.replace('-', '_') for part in canonical_path)
-        content = RST_TEMPLATE.format(
+        render = _render_with_automodule if package == raw_package else _render
+        content = render(
             import_prefix='.'.join(import_prefix_parts) + '.',
             import_name=import_name,
-            underline='=' * len(p),
+            underline=_underline(len(p)),
             label='-'.join(canonical_path),
         )
-        if package is not None and package == str(pathlib.Path(subdir, p)):
-            content += AUTOMODULE_TEMPLATE.format(package=import_name)
         path = ref_dir.joinpath(*canonical_path).with_suffix('.rst')
-        _write_if_needed(path=path, content=content)
+        _common.write_if_needed(path=path, content=content)
+    stamp = _Stamp(package=package, packages=packages, pyproject_tomls=pyproject_toml_names)
+    # an interrupted write mustn't leave a truncated stamp that could still parse
+    _files.write_atomically(stamp_path, json.dumps(stamp).encode())
 
 
-def _normalize(name: str) -> str:
-    """Normalize distribution package name according to PyPI rules.
+class _Stamp(typing.TypedDict):
+    package: str | None
+    packages: list[str]
+    pyproject_tomls: list[str]
 
-    https://packaging.python.org/en/latest/specifications/name-normalization/#name-normalization
+
+def _load_stamp(
+    path: pathlib.Path, watched: Iterable[pathlib.Path], pyproject_tomls: list[str]
+) -> _Stamp | None:
+    """Return what the last run recorded, if nothing watched has changed since.
+
+    The generated files depend on the ``package`` option, the templates in this module, and the
+    package list from ``ls.py``. That list depends on which directories exist and on their
+    ``pyproject.toml`` files. So it's enough to check that no watched file has been modified, no
+    watched directory has had entries added or removed, and the same ``pyproject.toml`` files
+    exist as when the stamp was written. Deleting one doesn't touch anything watched, so the
+    stamp records them. Watching the output directories catches generated files being deleted.
     """
-    return re.sub(r'[-_.]+', '-', name).lower()
+    try:
+        stamp_mtime = path.stat().st_mtime_ns
+        if any(p.stat().st_mtime_ns >= stamp_mtime for p in watched):
+            return None
+        stamp: _Stamp = json.loads(path.read_bytes())  # json detects the encoding of bytes itself
+        if stamp.get('pyproject_tomls') != pyproject_tomls:
+            return None
+        return stamp
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@functools.cache
+def _reference_docname(package: str) -> str:
+    """Return the docname of the package's reference page, computed once per package."""
+    return f'reference/charmlibs/{_normalize(package)}'
+
 
+@functools.cache
+def _underline(length: int) -> str:
+    """Return an rst heading underline of the given length, shared between calls."""
+    return '=' * length
 
-def _write_if_needed(path: pathlib.Path, content: str) -> None:
-    """Write to path only if contents are different.
 
-    This allows sphinx-build to skip rebuilding pages that depend on the output of this extension
-    if the output hasn't actually changed.
+def _normalize(name: str) -> str:
+    """Normalize distribution package name according to PyPI rules.
+
+    https://packaging.python.org/en/latest/specifications/name-normalization/#name-normalization
     """
-    if not path.exists() or path.read_text() != content:
-        path.write_text(content)
+    return NAME_SEPARATOR_PATTERN.sub('-', name).lower()
@@ -47,9 +47,16 @@ import json
 import pathlib
 import re
 import subprocess
+import sys
 from typing import Any
 
 _DOCS_DIR = pathlib.Path(__file__).parent.parent.resolve()
+# share helpers with the local Sphinx extensions, which use the repo tooling's helpers in turn
+sys.path.insert(0, str(_DOCS_DIR / 'extensions'))
+sys.path.insert(0, str(_DOCS_DIR.parent / '.scripts'))
+
+import _common  # noqa: E402
+
 _REPO_ROOT = _DOCS_DIR.parent
 _REPO_MAIN_URL = 'https://github.com/canonical/charmlibs/blob/main'
 _TOCTREE_HEADER = """\
@@ -89,7 +96,7 @@ def _main() -> None:
         path = _DOCS_DIR / category / f'_lib-{category}.md'
         content = _TOCTREE_HEADER + '\n'.join(sorted(entries)) + '\n' + _TOCTREE_FOOTER
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content)
+        _common.write_if_needed(path, content)
 
 
 def _copy_category(
@@ -109,7 +116,7 @@ def _copy_category(
         title = _extract_h1(content, source)
         content = _prefix_h1(content, lib_path.name, source.suffix)
         content = _rewrite_links(content, source, sphinx_map)
-        (out_dir / source.name).write_text(content)
+        _common.write_if_needed(out_dir / source.name, content)
         entries.append(f'{lib_path.name}: {title} <charmlibs/{lib_path}/{source.stem}>')
     return entries
 
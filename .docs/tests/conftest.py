@@ -14,8 +14,9 @@
 
 """Pytest configuration for docs tests.
 
-Adds ``extensions/`` and ``scripts/`` to sys.path so that Sphinx
-extensions and the diataxis preprocessor can be imported from test files.
+Adds ``extensions/``, ``scripts/`` and the repo's ``.scripts/`` to sys.path so that
+Sphinx extensions (and the tooling they import) and the diataxis preprocessor can be
+imported from test files.
 """
 
 import pathlib
@@ -24,3 +25,4 @@ import sys
 _DOCS_DIR = pathlib.Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(_DOCS_DIR / 'extensions'))
 sys.path.insert(0, str(_DOCS_DIR / 'scripts'))
+sys.path.insert(0, str(_DOCS_DIR.parent / '.scripts'))
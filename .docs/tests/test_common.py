@@ -0,0 +1,55 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the helpers shared by the local Sphinx extensions."""
+
+from __future__ import annotations
+
+import os
+import typing
+
+import _common
+import pytest
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+
+def test_write_if_needed_creates_file(tmp_path: pathlib.Path):
+    path = tmp_path / 'page.md'
+    _common.write_if_needed(path, '# Title\n')
+    assert path.read_text() == '# Title\n'
+    assert list(tmp_path.iterdir()) == [path]  # no temporary file left behind
+
+
+@pytest.mark.parametrize('size', [10, _common._MMAP_THRESHOLD * 2])
+def test_write_if_needed_skips_unchanged(tmp_path: pathlib.Path, size: int):
+    path = tmp_path / 'page.md'
+    content = 'x' * size
+    _common.write_if_needed(path, content)
+    os.utime(path, ns=(0, 0))
+    _common.write_if_needed(path, content)
+    assert path.stat().st_mtime_ns == 0
+
+
+@pytest.mark.parametrize('size', [10, _common._MMAP_THRESHOLD * 2])
+def test_write_if_needed_rewrites_changed(tmp_path: pathlib.Path, size: int):
+    path = tmp_path / 'page.md'
+    _common.write_if_needed(path, 'x' * size)
+    os.utime(path, ns=(0, 0))
+    _common.write_if_needed(path, 'x' * (size - 1) + 'y')  # same size, different content
+    assert path.stat().st_mtime_ns != 0
+    assert path.read_text().endswith('y')
@@ -18,6 +18,7 @@
 
 from __future__ import annotations
 
+import os
 import pathlib
 
 import diataxis_preprocessor as pp
@@ -229,6 +230,24 @@ def test_copy_category(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
     assert 'mylib: Deploy <charmlibs/mylib/deploy>' in entries
 
 
+def test_copy_category_skips_unchanged(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    docs_dir = tmp_path / 'docs_site'
+    source = tmp_path / 'lib' / 'docs' / 'tutorial.md'
+    source.parent.mkdir(parents=True)
+    source.write_text('# My Tutorial\n\nContent.\n')
+    monkeypatch.setattr(pp, '_DOCS_DIR', docs_dir)
+    monkeypatch.setattr(pp, '_REPO_ROOT', tmp_path)
+    pp._copy_category([source], pathlib.PurePath('mylib'), 'tutorials', {})
+    out = docs_dir / 'tutorials' / 'charmlibs' / 'mylib' / 'tutorial.md'
+    os.utime(out, ns=(0, 0))
+    pp._copy_category([source], pathlib.PurePath('mylib'), 'tutorials', {})
+    assert out.stat().st_mtime_ns == 0
+    source.write_text('# My Tutorial\n\nNew content.\n')
+    pp._copy_category([source], pathlib.PurePath('mylib'), 'tutorials', {})
+    assert out.stat().st_mtime_ns != 0
+    assert out.read_text().endswith('New content.\n')
+
+
 def test_copy_category_interface(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
     docs_dir = tmp_path / 'docs_site'
     expl_dir = tmp_path / 'lib' / 'docs' / 'explanation'
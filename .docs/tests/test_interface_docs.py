@@ -0,0 +1,49 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the 'interface_docs' local Sphinx extension."""
+
+from __future__ import annotations
+
+import typing
+
+import interface_docs
+import pytest
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+_BASE_URL = 'https://example.com/v0'
+
+
+@pytest.mark.parametrize(
+    ('readme', 'expected'),
+    [
+        ('[schema](./schema.py)', f'[schema]({_BASE_URL}/./schema.py)'),
+        ('[site](https://example.com)', '[site](https://example.com)'),
+        (r'[\[Pydantic Schema\]](schema.py)', rf'[\[Pydantic Schema\]]({_BASE_URL}/schema.py)'),
+        ('[a](x) and [b](y)', f'[a]({_BASE_URL}/x) and [b]({_BASE_URL}/y)'),
+        ('[a [b] c](x)', f'[a [b] c]({_BASE_URL}/x)'),
+        # the whole badge is one link, so only its target is rewritten, not the image's
+        ('[![badge](img.svg)](x)', f'[![badge](img.svg)]({_BASE_URL}/x)'),
+    ],
+)
+def test_write_readme_links(tmp_path: pathlib.Path, readme: str, expected: str):
+    source = tmp_path / 'README.md'
+    source.write_text(readme)
+    target = tmp_path / 'v0.md'
+    interface_docs._write_readme(source, target, label='label', base_url=_BASE_URL)
+    assert target.read_text() == f'(label)=\n{expected}'
@@ -0,0 +1,106 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the 'package_docs' local Sphinx extension."""
+
+from __future__ import annotations
+
+import json
+import os
+import typing
+
+import package_docs
+import pytest
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+
+def test_load_stamp(tmp_path: pathlib.Path):
+    watched = tmp_path / 'packages'
+    watched.mkdir()
+    stamp = tmp_path / 'stamp'
+    assert package_docs._load_stamp(stamp, watched=[watched], pyproject_tomls=[]) is None
+    os.utime(watched, ns=(0, 0))
+    stamp.write_text('{"package": "foo", "packages": ["bar", "foo"], "pyproject_tomls": []}')
+    assert package_docs._load_stamp(stamp, watched=[watched], pyproject_tomls=[]) == {
+        'package': 'foo',
+        'packages': ['bar', 'foo'],
+        'pyproject_tomls': [],
+    }
+    (watched / 'new-package').mkdir()
+    assert package_docs._load_stamp(stamp, watched=[watched], pyproject_tomls=[]) is None
+
+
+def test_load_stamp_invalid(tmp_path: pathlib.Path):
+    stamp = tmp_path / 'stamp'
+    stamp.write_text('foo')
+    assert package_docs._load_stamp(stamp, watched=[], pyproject_tomls=[]) is None
+
+
+def test_load_stamp_watches_file_contents(tmp_path: pathlib.Path):
+    pyproject_toml = tmp_path / 'pyproject.toml'
+    pyproject_toml.write_text('[project]\n')
+    os.utime(pyproject_toml, ns=(0, 0))
+    stamp = tmp_path / 'stamp'
+    stamp.write_text('{"package": null, "packages": ["foo"], "pyproject_tomls": ["foo"]}')
+    watched = [pyproject_toml]
+    assert package_docs._load_stamp(stamp, watched=watched, pyproject_tomls=['foo']) is not None
+    pyproject_toml.write_text('[tool.foo]\n')
+    assert package_docs._load_stamp(stamp, watched=watched, pyproject_tomls=['foo']) is None
+
+
+@pytest.fixture
+def root(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    (tmp_path / '.docs').mkdir()
+    (tmp_path / '.scripts').mkdir()
+    (tmp_path / '.scripts' / 'ls.py').touch()
+    (tmp_path / 'interfaces').mkdir()
+    for package in ('bar', 'foo'):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / 'pyproject.toml').write_text('[project]\n')
+
+    def ls_paths(root: pathlib.Path, category: str) -> list[str]:
+        return sorted(p.parent.name for p in root.glob('*/pyproject.toml'))
+
+    monkeypatch.setattr(package_docs._common, 'ls_paths', ls_paths)
+    return tmp_path
+
+
+def test_main_relists_packages_after_pyproject_toml_deleted(root: pathlib.Path):
+    stamp_path = root / '.docs' / 'reference' / '.package-docs-stamp'
+    package_docs._main(docs_dir=root / '.docs', package=None)
+    assert json.loads(stamp_path.read_text())['packages'] == ['bar', 'foo']
+    stamp_mtime = stamp_path.stat().st_mtime_ns
+    package_docs._main(docs_dir=root / '.docs', package=None)
+    assert stamp_path.stat().st_mtime_ns == stamp_mtime  # nothing changed, so nothing rewritten
+    (root / 'foo' / 'pyproject.toml').unlink()
+    package_docs._main(docs_dir=root / '.docs', package=None)
+    assert json.loads(stamp_path.read_text())['packages'] == ['bar']
+
+
+def test_main_package_pass_relists_packages_after_pyproject_toml_deleted(root: pathlib.Path):
+    stamp_path = root / '.docs' / 'reference' / '.package-docs-stamp'
+    package_docs._main(docs_dir=root / '.docs', package=None)
+    (root / 'foo' / 'pyproject.toml').unlink()
+    package_docs._main(docs_dir=root / '.docs', package='bar')
+    assert json.loads(stamp_path.read_text()) == {
+        'package': 'bar',
+        'packages': ['bar'],
+        'pyproject_tomls': ['bar/pyproject.toml'],
+    }
+    bar_rst = root / '.docs' / 'reference' / 'charmlibs' / 'bar.rst'
+    assert bar_rst.read_text().endswith('.. automodule:: bar')
@@ -15,7 +15,7 @@
 # /// script
 # requires-python = '>=3.10'
 # dependencies = [
-#     'tomli',
+#     'tomli; python_version < "3.11"',
 # ]
 # ///
 
@@ -31,8 +31,12 @@ import argparse
 import json
 import os
 import pathlib
+import sys
 
-import tomli
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
 
 
 def _parse_args() -> pathlib.Path:
@@ -47,11 +51,12 @@ def _main(package: pathlib.Path) -> None:
     line = f'matrix={json.dumps(matrix)}'
     print(line)
     with pathlib.Path(os.environ['GITHUB_OUTPUT']).open('a') as f:
-        print(line, file=f)
+        f.write(f'{line}\n')
 
 
 def _get_matrix(package: pathlib.Path) -> dict[str, list[str]]:
-    pyproject_toml = tomli.loads((package / 'pyproject.toml').read_text())
+    with (package / 'pyproject.toml').open('rb') as f:
+        pyproject_toml = tomllib.load(f)
     table = pyproject_toml.get('tool', {}).get('charmlibs', {}).get('functional', {})
     return {
         'ubuntu': [f'ubuntu-{v}' for v in table.get('ubuntu') or ['latest']],
@@ -16,7 +16,7 @@
 # requires-python = '>=3.10'
 # dependencies = [
 #     'packaging',
-#     'tomli',
+#     'tomli; python_version < "3.11"',
 # ]
 # ///
 
@@ -29,12 +29,17 @@ The package name must be provided as a positional commandline argument.
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import pathlib
+import re
+import sys
 
 import packaging.specifiers
-import tomli
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
 
 # The Python versions encoded here should be updated to reflect Ubuntu LTS releases.
 # The latest Python stable release (if different) should also be included.
@@ -43,6 +48,10 @@ VERSIONS = [
     '3.12',  # Ubuntu 24.04
     '3.14',  # Ubuntu 26.04
 ]
+_TABLE_HEADER_PATTERN = re.compile(r'^\[', flags=re.MULTILINE)
+_REQUIRES_PYTHON_PATTERN = re.compile(
+    r'^requires-python\s*=\s*([\'"])([^\'"\n]*)\1\s*(?:#.*)?$', flags=re.MULTILINE
+)
 
 
 def _parse_args() -> pathlib.Path:
@@ -54,24 +63,41 @@ def _parse_args() -> pathlib.Path:
 
 def _main(package: pathlib.Path) -> None:
     versions = _get_supported_python_versions(package=package)
-    lines = [
-        f'versions={json.dumps(versions)}',
-        f'min_version={versions[0]}',
-    ]
+    output = f'versions={_json_list(versions)}\nmin_version={versions[0]}\n'
+    print(output, end='')  # logging
     with pathlib.Path(os.environ['GITHUB_OUTPUT']).open('a') as f:
-        for line in lines:
-            print(line)  # logging
-            print(line, file=f)
+        f.write(output)
 
 
 def _get_supported_python_versions(package: pathlib.Path) -> list[str]:
-    pyproject_toml = tomli.loads((package / 'pyproject.toml').read_text())
-    requires_python = pyproject_toml['project']['requires-python']
+    requires_python = _get_requires_python((package / 'pyproject.toml').read_text())
     version_set = packaging.specifiers.SpecifierSet(requires_python)
     supported_versions = [v for v in VERSIONS if v in version_set]
     assert supported_versions, f'No version from {VERSIONS} matches {requires_python}!'
     return supported_versions
 
 
+def _get_requires_python(pyproject_toml: str) -> str:
+    """Return project.requires-python from the contents of a pyproject.toml file.
+
+    The value is usually a one-line string in the [project] table, so look for that line before
+    falling back to parsing the whole file.
+    """
+    for table in _TABLE_HEADER_PATTERN.split(pyproject_toml):
+        if table.startswith('project]'):
+            if match := _REQUIRES_PYTHON_PATTERN.search(table):
+                return match[2]
+            break
+    return tomllib.loads(pyproject_toml)['project']['requires-python']
+
+
+def _json_list(strings: list[str]) -> str:
+    """Return strings as a JSON list, formatted like json.dumps, without importing json.
+
+    The strings are Python version numbers, so they never need escaping.
+    """
+    return '[' + ', '.join(f'"{s}"' for s in strings) + ']'
+
+
 if __name__ == '__main__':
     _main(package=_parse_args())
@@ -41,13 +41,15 @@ def _main() -> None:
         items = json.loads(subprocess.check_output(cmd, text=True))
         include = [{'package': item['path'], 'tag': _get_tag(item)} for item in items]
         _output({
-            'include': json.dumps(include),
+            'include': json.dumps(include, separators=(',', ':')),
             'skip-juju': 'false',
             'repository-url': 'https://upload.pypi.org/legacy/',
         })
     elif event_name == 'workflow_dispatch':
         _output({
-            'include': json.dumps([{'package': event['inputs']['package'], 'tag': ''}]),
+            'include': json.dumps(
+                [{'package': event['inputs']['package'], 'tag': ''}], separators=(',', ':')
+            ),
             'skip-juju': event['inputs']['skip-juju'],
             'repository-url': 'https://test.pypi.org/legacy/',
         })
@@ -63,14 +65,13 @@ def _get_tag(item: dict[str, str]) -> str:
 
 
 def _output(di: dict[str, str]) -> None:
-    for v in di.values():
-        if not isinstance(v, str):  # type: ignore
-            print(f'Unexpected type {type(v)} for value: v')
-            sys.exit(1)
-    output = '\n'.join(f'{k}={v}' for k, v in di.items())
+    if not all(isinstance(v, str) for v in di.values()):  # type: ignore
+        print(f'Unexpected non-str value in outputs: {di}')
+        sys.exit(1)
+    output = ''.join(f'{k}={v}\n' for k, v in di.items())
+    print(output, end='')
     with pathlib.Path(os.environ['GITHUB_OUTPUT']).open('a') as f:
-        print(output)
-        print(output, file=f)
+        f.write(output)
 
 
 if __name__ == '__main__':
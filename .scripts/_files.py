@@ -0,0 +1,33 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Filesystem helpers shared by the tooling scripts and the local Sphinx extensions."""
+
+from __future__ import annotations
+
+import typing
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+
+def write_atomically(path: pathlib.Path, data: bytes) -> None:
+    """Write data to path, so that readers never see path partially written.
+
+    The data is written to a temporary file next to path, which is then renamed over path.
+    """
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(data)
+    tmp.replace(path)
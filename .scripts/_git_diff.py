@@ -0,0 +1,65 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared `git diff --name-only` for the tooling and CI scripts.
+
+Several scripts diff against the same base ref in a single CI job. On GitHub runners, the result
+is cached in `$RUNNER_TEMP`, keyed by the resolved commit SHAs, so that git only diffs once. The
+key doesn't cover uncommitted changes, so the cache is only used when the working tree is clean.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import subprocess
+
+import _files
+
+_CACHE_NAME = '.changed-cache.json'
+
+
+def changed_paths(base: str) -> list[str]:
+    """Return the paths changed between `base` and the current state on disk.
+
+    Outside GitHub Actions the working tree may change between invocations, so nothing is cached.
+    """
+    runner_temp = os.environ.get('RUNNER_TEMP')
+    if not runner_temp or _has_uncommitted_changes():
+        return _diff(base)
+    cmd = ['git', 'rev-parse', base, 'HEAD']
+    base_sha, head_sha = subprocess.check_output(cmd, text=True).split()
+    key = f'{base_sha}..{head_sha}'
+    cache_path = pathlib.Path(runner_temp, _CACHE_NAME)
+    try:
+        cache: dict[str, list[str]] = json.loads(cache_path.read_text())
+    except (FileNotFoundError, ValueError):
+        cache = {}
+    if key not in cache:
+        cache[key] = _diff(base)
+        _files.write_atomically(cache_path, json.dumps(cache).encode())
+    return cache[key]
+
+
+def _has_uncommitted_changes() -> bool:
+    # Untracked files aren't listed by `git diff`, so they don't make a cached result stale.
+    cmd = ['git', 'status', '--porcelain', '--untracked-files=no']
+    return bool(subprocess.check_output(cmd))
+
+
+def _diff(base: str) -> list[str]:
+    # -z stops git quoting unusual paths, and --no-renames lists both sides of a move as changed.
+    cmd = ['git', 'diff', '--name-only', '--no-renames', '-z', base]
+    return subprocess.check_output(cmd, text=True).split('\0')[:-1]
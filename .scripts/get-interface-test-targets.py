@@ -27,12 +27,16 @@ Only outputs targets that there are test cases for by default.
 """
 
 import argparse
+import concurrent.futures
 import json
 import logging
+import os
 import pathlib
+import posixpath
 import re
 import subprocess
 import tempfile
+import typing
 
 import yaml
 
@@ -40,9 +44,24 @@ _REPO_ROOT = pathlib.Path(__file__).parent.parent
 
 logger = logging.getLogger(str(pathlib.Path(__file__).relative_to(_REPO_ROOT)))
 
+# use libyaml's safe loader if PyYAML was built with it, as it's much faster than pure Python
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# any line starting with 'def test', ignoring leading whitespace
+_TEST_DEF_PATTERN = re.compile(rb'^\s*def test', re.MULTILINE)
+
+_METADATA_FILES = ('metadata.yaml', 'charmcraft.yaml')
+
+# the tree entry mode git uses for symlinks, whose blob is the link target
+_SYMLINK_MODE = '120000'
+_MAX_SYMLINK_HOPS = 8
+
+# (url, ref, charm_root) of a charm listed in an interface.yaml
+_CharmSource = tuple[str, str | None, str]
+
 
 def _main() -> None:
-    logging.basicConfig(level=logging.DEBUG)
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper())
     logger.setLevel(logging.WARNING)
     parser = argparse.ArgumentParser()
     parser.add_argument('interface', help='Path from repo root to specific interface directory.')
@@ -62,7 +81,7 @@ def _main() -> None:
         include_interface=args.include_interface,
         include_charm_name=not args.exclude_charm,
     )
-    output = json.dumps(targets)
+    output = json.dumps(targets, separators=(',', ':'))
     logger.info(output)
     print(output)
 
@@ -95,13 +114,14 @@ def _target_from_interface(
             - endpoint (name)
     """
     interface = _REPO_ROOT / interface_str
-    version_dirs = sorted((interface / 'interface').glob('v[0-9]*'))
+    version_dirs = _version_dirs(interface)
     if not version_dirs:
         logger.warning('%s does not define any interface versions.', interface_str)
         return []
-    targets: list[dict[str, str]] = []
+    jobs: list[tuple[str, str, str, _CharmSource]] = []
     for v in version_dirs:
-        interface_yaml = yaml.safe_load((v / 'interface.yaml').read_text())
+        with (v / 'interface.yaml').open('rb') as f:
+            interface_yaml = yaml.load(f, Loader=_YamlLoader)  # noqa: S506  # safe loader
         if (disable := v / 'tests' / '.disable').exists():
             msg = 'Targets for %s %s will not be included since %s exists.'
             logger.warning(msg, interface_str, v.name, disable)
@@ -119,26 +139,49 @@ def _target_from_interface(
                 logger.debug('%s %s %s', only_charm, charm['name'], charm)
                 if only_charm and charm['name'] != only_charm:
                     continue
-                endpoints = _get_endpoints(
-                    interface=interface.name,
-                    role_key=f'{role}s',
-                    charm_repo=charm['url'],
-                    charm_ref=charm.get('branch', 'main'),
-                    charm_root=charm.get('test_setup', {}).get('charm_root', ''),
-                )
-                for endpoint in endpoints:
-                    target: dict[str, str] = {}
-                    if include_interface:
-                        target['interface'] = interface.name
-                    target['version'] = v.name
-                    target['role'] = role
-                    if include_charm_name:
-                        target['charm_name'] = charm['name']
-                    target['endpoint'] = endpoint
-                    targets.append(target)
+                ref = charm.get('branch', 'main')
+                root = charm.get('test_setup', {}).get('charm_root', '')
+                jobs.append((v.name, role, charm['name'], (charm['url'], ref, root)))
+    # Getting the endpoints means cloning each charm repo, so clone them all concurrently.
+    # A charm may be listed for several versions and roles, and a repo may contain several
+    # charms, so clone each repo and ref once, and read the metadata for all its charms.
+    roots: dict[tuple[str, str | None], set[str]] = {}
+    for *_, (charm_repo, charm_ref, charm_root) in jobs:
+        roots.setdefault((charm_repo, charm_ref), set()).add(charm_root)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = {
+            key: executor.submit(_fetch_metadata, *key, charm_roots=sorted(charm_roots))
+            for key, charm_roots in roots.items()
+        }
+        targets: list[dict[str, str]] = []
+        for version, role, charm_name, source in jobs:
+            metadata = futures[source[:2]].result()
+            for endpoint in _get_endpoints(interface.name, f'{role}s', source, metadata):
+                target: dict[str, str] = {}
+                if include_interface:
+                    target['interface'] = interface.name
+                target['version'] = version
+                target['role'] = role
+                if include_charm_name:
+                    target['charm_name'] = charm_name
+                target['endpoint'] = endpoint
+                targets.append(target)
     return targets
 
 
+def _version_dirs(interface: pathlib.Path) -> list[pathlib.Path]:
+    """Return the interface's version directories (v0, v1, ...) in version order."""
+    # scandir names rather than globbing, which would stat each entry
+    try:
+        with os.scandir(interface / 'interface') as entries:
+            names = [e.name for e in entries if e.name[:1] == 'v' and e.name[1:].isdecimal()]
+    except FileNotFoundError:
+        return []
+    # sort numerically, so that v10 comes after v9 rather than after v1
+    names.sort(key=lambda name: int(name[1:]))
+    return [interface / 'interface' / name for name in names]
+
+
 def _has_tests(version_dir: pathlib.Path, role: str) -> bool:
     """Return whether the test file exists and seems to contain at least one test.
 
@@ -146,45 +189,168 @@ def _has_tests(version_dir: pathlib.Path, role: str) -> bool:
     ignoring leading whitespace.
     """
     test_file = version_dir / 'tests' / f'test_{role}.py'
-    if not test_file.exists():
+    try:
+        data = test_file.read_bytes()  # the pattern is ASCII, so there's no need to decode
+    except FileNotFoundError:
         logger.warning('%s does not exist.', test_file.relative_to(_REPO_ROOT))
         return False
-    has_tests = bool(re.search(r'^\s*def test', test_file.read_text(), re.MULTILINE))
+    has_tests = _TEST_DEF_PATTERN.search(data) is not None
     if not has_tests:
         msg = '%s exists, but does not seem to have any tests.'
         logger.warning(msg, test_file.relative_to(_REPO_ROOT))
     return has_tests
 
 
-def _get_endpoints(
-    interface: str, role_key: str, charm_repo: str, charm_ref: str | None, charm_root: str
-) -> list[str]:
-    """Clone the charm repo and return the endpoints for the interface and role."""
+def _fetch_metadata(
+    charm_repo: str, charm_ref: str | None, charm_roots: list[str]
+) -> dict[str, dict[str, typing.Any]]:
+    """Clone the charm repo and return the metadata files that exist, loaded and keyed by path.
+
+    Reads the metadata for every charm root in the repo from a single clone.
+    """
     with tempfile.TemporaryDirectory() as td:
         repo_path = pathlib.Path(td, 'charm-repo')
-        git_clone: list[str | pathlib.Path] = ['git', 'clone', '--depth', '1']
+        # Only a couple of small files are needed, so skip the checkout and fetch just those blobs.
+        git_clone: list[str | pathlib.Path] = [
+            'git',
+            'clone',
+            '--depth',
+            '1',
+            '--filter=blob:none',
+            '--no-checkout',
+        ]
         if charm_ref:
             git_clone.extend(['--branch', charm_ref])
         git_clone.extend([charm_repo, repo_path])
         logger.info(git_clone)
         subprocess.check_call(git_clone, cwd=td)
-        for meta in 'metadata.yaml', 'charmcraft.yaml':
-            if (path := repo_path / charm_root / meta).exists():
-                text = path.read_text()
-                logger.debug('%s:%s\n%s\n', charm_repo, path.relative_to(repo_path), text)
-                loaded = yaml.safe_load(text)
-                if role_key not in loaded:
-                    continue
-                endpoints = [e for e, d in loaded[role_key].items() if d['interface'] == interface]
-                if endpoints:
-                    return endpoints
-                raise ValueError(
-                    f'{interface} not found in {path}[{role_key}]: {loaded[role_key]}'
-                )
-            else:
-                logger.debug('%s:%s does not exist', charm_repo, path.relative_to(repo_path))
-        msg = f'{role_key} {interface} not found in metadata for {charm_repo}@{charm_ref}/{charm_root}'  # noqa: E501
-        raise ValueError(msg)
+        metas = [path for root in charm_roots for path in _metadata_paths(root)]
+        files = _read_files(repo_path, metas)
+    metadata: dict[str, dict[str, typing.Any]] = {}
+    for path, text in files.items():
+        if text is None:
+            logger.debug('%s:%s does not exist', charm_repo, path)
+            continue
+        logger.debug('%s:%s\n%s\n', charm_repo, path, text)
+        metadata[path] = yaml.load(text, Loader=_YamlLoader)  # noqa: S506  # safe loader
+    return metadata
+
+
+def _get_endpoints(
+    interface: str,
+    role_key: str,
+    source: _CharmSource,
+    metadata: dict[str, dict[str, typing.Any]],
+) -> list[str]:
+    """Return the endpoints for the interface and role from the charm's loaded metadata."""
+    charm_repo, charm_ref, charm_root = source
+    for path in _metadata_paths(charm_root):
+        loaded = metadata.get(path)
+        if loaded is None or role_key not in loaded:
+            continue
+        endpoints = [e for e, d in loaded[role_key].items() if d['interface'] == interface]
+        if endpoints:
+            return endpoints
+        raise ValueError(f'{interface} not found in {path}[{role_key}]: {loaded[role_key]}')
+    msg = f'{role_key} {interface} not found in metadata for {charm_repo}@{charm_ref}/{charm_root}'
+    raise ValueError(msg)
+
+
+def _metadata_paths(charm_root: str) -> list[str]:
+    """Return the paths that the charm's metadata may be in, in order of preference."""
+    return [pathlib.PurePosixPath(charm_root, m).as_posix() for m in _METADATA_FILES]
+
+
+def _read_files(repo_path: pathlib.Path, paths: list[str]) -> dict[str, str | None]:
+    """Read files from HEAD, following symlinks like a checkout would, with None for missing files.
+
+    Each level of symlinks costs one fetch of the blobs it needs, so usually there's just one.
+    Symlinks that leave the repo, or that don't resolve within a few hops, count as missing.
+    """
+    resolved = {p: p for p in paths}
+    files: dict[str, str | None] = dict.fromkeys(paths)
+    pending = paths
+    for _ in range(_MAX_SYMLINK_HOPS + 1):
+        if not pending:
+            break
+        entries = _ls_tree(repo_path, sorted({resolved[p] for p in pending}))
+        oids = sorted({oid for _, oid in entries.values()})
+        _prefetch(repo_path, oids)
+        blobs = _read_blobs(repo_path, oids)
+        links: list[str] = []
+        for path in pending:
+            entry = entries.get(resolved[path])
+            if entry is None:
+                continue
+            mode, oid = entry
+            if mode != _SYMLINK_MODE:
+                files[path] = blobs[oid]
+                continue
+            # the target is relative to the symlink's directory, or absolute
+            link_dir = posixpath.dirname(resolved[path])
+            target = posixpath.normpath(posixpath.join(link_dir, blobs[oid]))
+            if target.startswith(('/', '../')) or target == '..':
+                continue
+            resolved[path] = target
+            links.append(path)
+        pending = links
+    return files
+
+
+def _ls_tree(repo_path: pathlib.Path, paths: list[str]) -> dict[str, tuple[str, str]]:
+    """Return the (mode, object id) of each path that is a file or symlink in HEAD."""
+    cmd = ['git', '--literal-pathspecs', 'ls-tree', '-z', 'HEAD', '--', *paths]
+    out = subprocess.run(cmd, cwd=repo_path, capture_output=True, check=True).stdout
+    entries: dict[str, tuple[str, str]] = {}
+    for line in out.decode().split('\0'):
+        if not line:
+            continue
+        info, path = line.split('\t', 1)  # '<mode> <type> <object id>\t<path>'
+        mode, object_type, oid = info.split()
+        if object_type == 'blob':  # skip directories and submodules
+            entries[path] = (mode, oid)
+    return entries
+
+
+def _prefetch(repo_path: pathlib.Path, oids: list[str]) -> None:
+    """Fetch the objects missing from a partial clone in one round trip.
+
+    Otherwise `git cat-file` fetches each missing blob on its own as it reaches it. These are the
+    options git itself uses for lazy fetches.
+    """
+    if not oids:
+        return
+    cmd = [
+        'git',
+        '-c',
+        'fetch.negotiationAlgorithm=noop',
+        'fetch',
+        'origin',
+        '--no-tags',
+        '--no-write-fetch-head',
+        '--recurse-submodules=no',
+        '--filter=blob:none',
+        '--stdin',
+    ]
+    stdin = ''.join(f'{oid}\n' for oid in oids).encode()
+    subprocess.run(cmd, cwd=repo_path, input=stdin, capture_output=True, check=True)
+
+
+def _read_blobs(repo_path: pathlib.Path, oids: list[str]) -> dict[str, str]:
+    """Read blobs by object id in one `git cat-file --batch` call."""
+    stdin = ''.join(f'{oid}\n' for oid in oids).encode()
+    # Use a fixed header format, so that headers are always '<size>'.
+    cmd = ['git', 'cat-file', '--batch=%(objectsize)']
+    out = subprocess.run(cmd, cwd=repo_path, input=stdin, capture_output=True, check=True).stdout
+    blobs: dict[str, str] = {}
+    pos = 0
+    for oid in oids:
+        newline = out.index(b'\n', pos)
+        size = int(out[pos:newline])
+        pos = newline + 1
+        blobs[oid] = out[pos : pos + size].decode()
+        pos += size + 1  # the content is followed by a newline
+    return blobs
 
 
 if __name__ == '__main__':
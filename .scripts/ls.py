@@ -3,6 +3,7 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
+#     "packaging",
 #     "PyYAML",
 # ]
 # ///
@@ -31,24 +32,40 @@ See the the command-line help for options.
 from __future__ import annotations
 
 import argparse
+import ast
+import concurrent.futures
 import contextlib
 import dataclasses
+import fnmatch
 import functools
-import io
 import json
 import logging
+import os
 import pathlib
 import re
 import subprocess
 import tarfile
 import tempfile
 import tomllib
+import typing
 
+import packaging.version
 import yaml
 
+import _git_diff
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
 _REPO_ROOT = pathlib.Path(__file__).parent.parent
+_DOC_SUFFIXES = ('.md', '.rst')
+# runs of characters that PyPI name normalization replaces with a single '-'
+_NAME_SEPARATORS = re.compile(r'[-_.]+')
+# hatchling's default pattern for reading the version from a file
+_HATCH_VERSION_PATTERN = re.compile(
+    r'^(__version__|VERSION) *= *([\'"])v?(?P<version>.+?)\2', flags=re.IGNORECASE | re.MULTILINE
+)
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(str(pathlib.Path(__file__).relative_to(_REPO_ROOT)))
 
 
@@ -77,6 +94,7 @@ class Info:
 
 def _main() -> None:
     """Parse command-line arguments and output packages as JSON."""
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper())
     parser = argparse.ArgumentParser()
     parser.add_argument('category', choices=('packages', 'interfaces'))
     parser.add_argument('old_ref', nargs='?')
@@ -118,6 +136,53 @@ def _main() -> None:
         print(json.dumps(result, indent=2 if args.indent_json else None))
 
 
+def paths(
+    category: str,
+    include_examples: bool = True,
+    include_placeholders: bool = True,
+    include_testing: bool = True,
+) -> list[str]:
+    """Return the sorted paths of all packages or interfaces in the current repository.
+
+    Equivalent to running this script with only the category and ``--exclude-*`` flags,
+    but without the cost of a subprocess. Used by the docs extensions.
+    """
+    return values(
+        category,
+        'path',
+        include_examples=include_examples,
+        include_placeholders=include_placeholders,
+        include_testing=include_testing,
+    )
+
+
+def values(
+    category: str,
+    field: str,
+    old_ref: str | None = None,
+    include_examples: bool = True,
+    include_placeholders: bool = True,
+    include_testing: bool = True,
+) -> list[str]:
+    """Return one sorted field of the packages or interfaces, optionally only those changed.
+
+    Equivalent to running this script with ``--output-only field`` and an optional ``old_ref``,
+    but without the cost of a subprocess. Used by the CI scripts.
+    """
+    infos = _ls(
+        category=category,
+        old_ref=old_ref,
+        new_ref=None,
+        only_if_version_changed=False,
+        include_examples=include_examples,
+        include_placeholders=include_placeholders,
+        include_testing=include_testing,
+        regex=None,
+        output=[field],
+    )
+    return sorted(getattr(info, field) for info in infos)
+
+
 def _ls(
     category: str,
     old_ref: str | None,
@@ -156,21 +221,25 @@ def _ls(
     if include_placeholders:
         include.append('.package')
     with _snapshot_repo(new_ref) as root:
+        if category not in ('packages', 'interfaces'):
+            raise ValueError(f'Unknown value for `category` {category!r}')
+        # Get changes first, so that nothing needs listing if nothing has changed.
+        changes = _changes(ref=old_ref) if old_ref else None
         # Collect packages or interfaces.
-        if category == 'packages':
+        if changes is not None and not changes:
+            dirs: list[pathlib.Path] = []
+        elif category == 'packages':
             dirs = _packages(root, include=include, regex=regex)
-        elif category == 'interfaces':
-            dirs = _interfaces(root, include=include, regex=regex)
         else:
-            raise ValueError(f'Unknown value for `category` {category!r}')
+            dirs = _interfaces(root, include=include, regex=regex)
         # Filter based on changes.
         # Return full info if we calculate it.
-        if old_ref:
-            dirs = _changed_only(root, dirs, ref=old_ref)
+        if old_ref is not None and changes is not None:
+            dirs = [p for p in dirs if p.as_posix() in changes]
             if only_if_version_changed:
                 dirs = _get_changed_versions_only(category, root, dirs, ref=old_ref)
         if category == 'packages' and include_testing:
-            dirs.extend([t for p in dirs if _is_package(t := p / 'testing')])
+            dirs.extend([t for p in dirs if _is_package(t := p / 'testing', root=root)])
         # Calculate only the information needed.
         infos: list[Info] = []
         for path in dirs:
@@ -210,21 +279,25 @@ def _packages(root: pathlib.Path, include: list[str], regex: str | None) -> list
     sub-directory, as well as any directories listed in `include`, if they exists and have a
     'pyproject.toml' file with a 'project' table.
     """
-    paths: set[pathlib.Path] = set()
-    for r in root, root / 'interfaces':
-        paths.update(r.glob(r'[a-z]*'))
-        paths.update(r / i for i in include)
+    # Work with relative path strings, and only make Paths for the final result.
+    names: set[str] = set()
+    for prefix in '', 'interfaces/':
+        names.update(f'{prefix}{name}' for name in (*_lowercase_dirs(root / prefix), *include))
     if regex is not None:
-        paths = {path for path in paths if re.fullmatch(regex, str(path.relative_to(root)))}
-    return sorted(path.relative_to(root) for path in paths if _is_package(path))
+        names = {name for name in names if re.fullmatch(regex, name)}
+    return _sorted_paths(name for name in names if _is_package(pathlib.Path(name), root=root))
 
 
-def _is_package(path: pathlib.Path) -> bool:
-    """Return whether path points to a Python package."""
-    pyproject_toml = path / 'pyproject.toml'
-    if not pyproject_toml.exists():
+def _is_package(package: pathlib.Path, root: pathlib.Path) -> bool:
+    """Return whether package points to a Python package.
+
+    This goes through the cached `_pyproject_toml`, so each pyproject.toml is only parsed once,
+    even though the name and version are read from it later.
+    """
+    try:
+        return 'project' in _pyproject_toml(package, root=root)
+    except FileNotFoundError:
         return False
-    return 'project' in tomllib.loads(pyproject_toml.read_text())
 
 
 def _interfaces(root: pathlib.Path, include: list[str], regex: str | None) -> list[pathlib.Path]:
@@ -233,12 +306,10 @@ def _interfaces(root: pathlib.Path, include: list[str], regex: str | None) -> li
     Returns any directory starting with [a-z] from the interfaces sub-directory, as well as any
     directories listed in `include`, if they exist and have an 'interface' subdirectory.
     """
-    interfaces_root = root / 'interfaces'
-    paths: set[pathlib.Path] = {*interfaces_root.glob(r'[a-z]*')}
-    paths.update(interfaces_root / path for path in include)
+    names = {f'interfaces/{name}' for name in (*_lowercase_dirs(root / 'interfaces'), *include)}
     if regex is not None:
-        paths = {path for path in paths if re.fullmatch(regex, str(path.relative_to(root)))}
-    return sorted(path.relative_to(root) for path in paths if _is_interface(path))
+        names = {name for name in names if re.fullmatch(regex, name)}
+    return _sorted_paths(name for name in names if _is_interface(root / name))
 
 
 def _is_interface(path: pathlib.Path) -> bool:
@@ -246,25 +317,49 @@ def _is_interface(path: pathlib.Path) -> bool:
     return (path / 'interface').is_dir()
 
 
-def _changed_only(root: pathlib.Path, dirs: list[pathlib.Path], ref: str) -> list[pathlib.Path]:
-    """Return only those `dirs` that have changed between `ref` and current state on disk.
+def _lowercase_dirs(directory: pathlib.Path) -> list[str]:
+    """Return the names of the directories in `directory` that start with [a-z].
 
-    Untracked files are included as changes.
-    Calls `git diff` and `git ls-files` once each.
+    Uses a single scandir pass, where is_dir uses the entry type from the directory listing
+    instead of another stat call, except for symlinks, which are followed like glob does.
+    Returns an empty list if `directory` doesn't exist.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return [e.name for e in entries if 'a' <= e.name[0] <= 'z' and e.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+def _sorted_paths(names: Iterable[str]) -> list[pathlib.Path]:
+    """Return `names` as Paths, sorted by their plain string values."""
+    result = list(names)
+    result.sort()
+    return [pathlib.Path(name) for name in result]
+
+
+def _changes(ref: str) -> set[str]:
+    """Return the top-level and one-level-deep parents of files changed since `ref`.
+
+    e.g. a change to foo/bar/baz/bartholemew adds {foo, foo/bar}.
+    Compares with the current state on disk, and includes untracked files as changes.
+    Calls `git diff` (shared with other scripts in the same CI job) and `git ls-files` once each,
+    concurrently, since neither depends on the other.
     """
-    cmd = ['git', 'diff', '--name-only', ref]
-    names = subprocess.check_output(cmd, text=True).strip().splitlines()
     # Include untracked files (for running locally).
-    cmd = ['git', 'ls-files', '--others', '--exclude-standard']
-    names.extend(subprocess.check_output(cmd, text=True).strip().splitlines())
-    # Make set of all top-level and one-level-deep parents of changes.
-    # e.g. [foo/bar/baz/bartholemew] -> {foo, foo/bar}
-    changes: set[pathlib.Path] = set()
+    cmd = ['git', 'ls-files', '--others', '--exclude-standard', '-z']
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        untracked = executor.submit(subprocess.check_output, cmd, text=True)
+        names = list(_git_diff.changed_paths(ref))
+        names.extend(untracked.result().split('\0')[:-1])
+    # git always uses '/' as the separator, so split the strings rather than building Paths.
+    changes: set[str] = set()
     for name in names:
-        parts = pathlib.Path(name).parts
-        changes.add(pathlib.Path(parts[0]))
-        changes.add(pathlib.Path(*parts[:2]))
-    return [p for p in dirs if p in changes]
+        top, _, rest = name.partition('/')
+        changes.add(top)
+        if rest:
+            changes.add(f'{top}/{rest.partition("/")[0]}')
+    return changes
 
 
 def _get_changed_versions_only(
@@ -272,26 +367,38 @@ def _get_changed_versions_only(
 ) -> list[pathlib.Path]:
     """Returns only those packages that have had a version change between `ref` and current state.
 
-    Takes a snapshot of the repo at `ref` for comparison.
+    Takes a snapshot of just `dirs` at `ref` for comparison.
     Excludes changes where the new version is a dev version.
     """
-    with _snapshot_repo(ref) as old_root:
-        old_versions: dict[str, str] = {}
+    # Tests and docs aren't needed to read names and versions, and are most of each package.
+    with _snapshot_repo(ref, paths=dirs, exclude=('tests', 'docs')) as old_root:
+        old_names: dict[pathlib.Path, str] = {}
         for path in dirs:
             try:
                 name = _get_name(category, old_root, path)
             except FileNotFoundError:
                 continue
-            version = _get_version(category, old_root, path)
-            old_versions[name] = version
+            old_names[path] = name
+        current = [path for path in dirs if (root / path).exists()]
+        # Getting a package version may mean installing it with uv, which is slow but mostly
+        # waiting on subprocesses, so get the old and new versions of every package in parallel.
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            old_futures = {
+                path: executor.submit(_get_version, category, old_root, path) for path in old_names
+            }
+            new_futures = {
+                path: executor.submit(_get_version, category, root, path) for path in current
+            }
+            old_versions = {old_names[path]: f.result() for path, f in old_futures.items()}
+            new_versions = {path: f.result() for path, f in new_futures.items()}
     changed: list[pathlib.Path] = []
     for path in dirs:
-        if not (root / path).exists():
+        if path not in new_versions:
             logger.debug('%s no longer exists!', path)
             continue
         name = _get_name(category, root, path)
         old_version = old_versions.get(name)
-        new_version = _get_version(category, root, path)
+        new_version = new_versions[path]
         logger.info('%s (%s): %s -> %s', path, name, old_version, new_version)
         if new_version == old_version:
             logger.debug('Version unchanged')
@@ -303,21 +410,52 @@ def _get_changed_versions_only(
 
 
 @contextlib.contextmanager
-def _snapshot_repo(ref: str | None):
+def _snapshot_repo(
+    ref: str | None, paths: Sequence[pathlib.Path] | None = None, exclude: Sequence[str] = ()
+):
     """Yield a snapshot of the current repository at the specified reference in a temp dir.
 
-    If `ref` is `None`, yield the current repository root instead.
+    If `ref` is `None`, or the working tree is a clean checkout of `ref` (as when CI compares
+    with the commit it has checked out), yield the current repository root instead.
+    If `paths` is not `None`, only those of `paths` that exist at `ref` are included,
+    without their `exclude` subdirectories.
     """
-    if ref is None:
+    if ref is None or _is_clean_checkout(ref):
         yield _REPO_ROOT
         return
     with tempfile.TemporaryDirectory() as td:
-        root = pathlib.Path(td)
-        git = subprocess.run(['git', 'archive', ref], stdout=subprocess.PIPE, check=True)
-        stream = io.BytesIO(git.stdout)
-        with tarfile.open(fileobj=stream) as tar:
-            tar.extractall(path=root, filter='data')
-        yield root
+        cmd = ['git', 'archive', ref]
+        if paths is not None:
+            # git archive fails on paths that don't exist at ref, so list the ones that do.
+            ls_tree = ['git', 'ls-tree', '--name-only', ref, '--', *map(str, paths)]
+            existing = subprocess.check_output(ls_tree, text=True).splitlines()
+            if not existing:
+                yield pathlib.Path(td)
+                return
+            cmd.extend(['--', *existing])
+            cmd.extend(f':(exclude){path}/{sub}' for path in existing for sub in exclude)
+        # Stream the archive into tarfile, so it's extracted while git is still writing it rather
+        # than being buffered in memory. The 'data' filter refuses absolute paths, members
+        # outside td, and special files, whatever tar implementation the system has.
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE) as git:
+            try:
+                with tarfile.open(fileobj=git.stdout, mode='r|') as tar:
+                    tar.extractall(td, filter='data')
+            except tarfile.ReadError:
+                if git.wait() == 0:  # otherwise report git's failure rather than the empty archive
+                    raise
+        if git.returncode:
+            raise subprocess.CalledProcessError(git.returncode, git.args)
+        yield pathlib.Path(td)
+
+
+def _is_clean_checkout(ref: str) -> bool:
+    """Return whether HEAD is `ref` and there are no changes on disk, including untracked files."""
+    cmd = ['git', 'rev-parse', f'{ref}^{{commit}}', 'HEAD']
+    ref_sha, head_sha = subprocess.check_output(cmd, text=True).split()
+    if ref_sha != head_sha:
+        return False
+    return not subprocess.check_output(['git', 'status', '--porcelain'], text=True).strip()
 
 
 def _get_name(category: str, root: pathlib.Path, path: pathlib.Path) -> str:
@@ -399,20 +537,19 @@ def _get_docs(root: pathlib.Path, path: pathlib.Path) -> dict[str, list[str]]:
     result: dict[str, list[str]] = {}
     if not docs_dir.is_dir():
         return result
+    # List the docs dir once and check names, rather than a stat per candidate path.
+    names = set(os.listdir(docs_dir))
     for ext in ('.md', '.rst'):
-        tutorial = docs_dir / f'tutorial{ext}'
-        if tutorial.exists():
-            result['tutorials'] = [str(tutorial.relative_to(root / path))]
+        if f'tutorial{ext}' in names:
+            result['tutorials'] = [f'docs/tutorial{ext}']
             break
     for cat in ('how-to', 'explanation'):
-        cat_dir = docs_dir / cat
-        if not cat_dir.is_dir():
+        if cat not in names or not (docs_dir / cat).is_dir():
             continue
-        files = sorted(
-            str(f.relative_to(root / path))
-            for f in cat_dir.iterdir()
-            if f.suffix in ('.md', '.rst')
-        )
+        with os.scandir(docs_dir / cat) as entries:
+            files = sorted(
+                f'docs/{cat}/{e.name}' for e in entries if e.name.endswith(_DOC_SUFFIXES)
+            )
         if files:
             result[cat] = files
     return result
@@ -432,21 +569,76 @@ def _get_dist_name(package: pathlib.Path, root: pathlib.Path = _REPO_ROOT) -> st
     name = _pyproject_toml(package, root=root)['project']['name']
     # Normalize distribution package name according to PyPI rules.
     # https://packaging.python.org/en/latest/specifications/name-normalization/#name-normalization
-    return re.sub(r'[-_.]+', '-', name).lower().strip()
+    return _NAME_SEPARATORS.sub('-', name).lower().strip()
 
 
 @functools.cache
 def _get_package_version(package: pathlib.Path, root: pathlib.Path = _REPO_ROOT) -> str:
-    """Return the runtime version of the package."""
+    """Return the runtime version of the package.
+
+    The version is read from the package source where possible, and normalized the way the build
+    backend would. Otherwise the package is installed with uv to ask the build backend for it.
+    """
+    version = _read_package_version(package, root=root)
+    if version is not None:
+        try:
+            return str(packaging.version.Version(version))
+        except packaging.version.InvalidVersion:
+            logger.debug('Invalid version %r for %s, falling back to uv', version, package)
     name = _get_dist_name(package, root=root)
     script = f'import importlib.metadata; print(importlib.metadata.version("{name}"))'
     cmd = ['uv', 'run', '--no-project', '--with', root / package, 'python', '-c', script]
     return subprocess.check_output(cmd, cwd=root, text=True).strip()
 
 
+def _read_package_version(package: pathlib.Path, root: pathlib.Path) -> str | None:
+    """Return the version declared in the package source, or None if it can't be read directly.
+
+    Handles a static ``project.version``, hatch's default regex version source, and setuptools'
+    ``file`` and ``attr`` dynamic versions, which cover all the packages in this repository.
+    """
+    pyproject_toml = _pyproject_toml(package, root=root)
+    project = pyproject_toml['project']
+    if 'version' not in project.get('dynamic', ()):
+        return project['version']
+    tool = pyproject_toml.get('tool', {})
+    hatch_version = tool.get('hatch', {}).get('version', {})
+    if hatch_version.keys() == {'path'}:
+        match = _HATCH_VERSION_PATTERN.search((root / package / hatch_version['path']).read_text())
+        return match['version'] if match else None
+    setuptools_version = tool.get('setuptools', {}).get('dynamic', {}).get('version', {})
+    if setuptools_version.keys() == {'file'}:
+        files = setuptools_version['file']
+        if isinstance(files, str):
+            files = [files]
+        if len(files) == 1:
+            return (root / package / files[0]).read_text().strip()
+    if setuptools_version.keys() == {'attr'}:
+        module, _, attr = setuptools_version['attr'].rpartition('.')
+        src = root / package / 'src' / module.replace('.', '/')
+        for path in src / '__init__.py', src.with_suffix('.py'):
+            if path.exists():
+                return _read_module_str(path, attr)
+    return None
+
+
+def _read_module_str(path: pathlib.Path, name: str) -> str | None:
+    """Return the string literal assigned to name at the top level of the module, if any."""
+    for node in ast.parse(path.read_bytes()).body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(isinstance(t, ast.Name) and t.id == name for t in node.targets)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ):
+            return node.value.value
+    return None
+
+
 @functools.cache
 def _get_interface_version(path: pathlib.Path, root: pathlib.Path = _REPO_ROOT) -> str:
-    versions = [v.name for v in (root / path / 'interface').glob('v[0-9]*')]
+    with os.scandir(root / path / 'interface') as entries:
+        versions = [e.name for e in entries if fnmatch.fnmatchcase(e.name, 'v[0-9]*')]
     return max((v.removeprefix('v') for v in versions), key=int)
 
 
@@ -35,6 +35,9 @@ import tempfile
 
 import yaml
 
+# use libyaml's safe loader if PyYAML was built with it, as it's much faster than pure Python
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 # paths in this repo
 _REPO_ROOT = pathlib.Path(__file__).parent.parent
 _INTERFACES = _REPO_ROOT / 'interfaces'
@@ -146,7 +149,8 @@ class _Target:
 
         It is an error if the charm config doesn't exist or is defined more than once.
         """
-        interface_yaml = yaml.safe_load((self.interface_dir / 'interface.yaml').read_text())
+        with (self.interface_dir / 'interface.yaml').open('rb') as f:
+            interface_yaml = yaml.load(f, Loader=_YamlLoader)  # noqa: S506  # safe loader
         charms = interface_yaml[f'{self.role}rs']
         [charm_config] = [c for c in charms if c['name'] == self.charm_name]
         logger.info('Charm config: %s', charm_config)
@@ -154,7 +158,7 @@ class _Target:
 
 
 def _main() -> None:
-    logging.basicConfig(level=logging.DEBUG)
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper())
     parser = argparse.ArgumentParser()
     parser.add_argument('name', help='The interface name.')
     parser.add_argument('version', help='The interface version, e.g. `v2`.')
@@ -0,0 +1,30 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the shared filesystem helpers."""
+
+import pathlib
+
+import _files
+
+
+def test_write_atomically(tmp_path: pathlib.Path):
+    path = tmp_path / 'file.txt'
+    _files.write_atomically(path, b'one')
+    assert path.read_bytes() == b'one'
+    _files.write_atomically(path, b'two')
+    assert path.read_bytes() == b'two'
+    assert [p.name for p in tmp_path.iterdir()] == ['file.txt']  # no temporary file left behind
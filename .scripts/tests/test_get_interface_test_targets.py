@@ -0,0 +1,136 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the get-interface-test-targets script."""
+
+import importlib
+import pathlib
+import subprocess
+
+import pytest
+
+targets = importlib.import_module('get-interface-test-targets')
+
+_METADATA_YAML = 'requires:\n  db:\n    interface: foo\n'
+_CHARMCRAFT_YAML = 'provides:\n  a:\n    interface: foo\n  b:\n    interface: bar\n'
+
+
+@pytest.fixture
+def charm_repo(tmp_path: pathlib.Path) -> pathlib.Path:
+    root = tmp_path / 'charm-repo'
+    (root / 'my charm').mkdir(parents=True)
+    (root / 'tree' / 'metadata.yaml').mkdir(parents=True)
+    (root / 'metadata.yaml').write_text(_METADATA_YAML)
+    (root / 'my charm' / 'charmcraft.yaml').write_text(_CHARMCRAFT_YAML)
+    (root / 'tree' / 'metadata.yaml' / 'file').write_text('')
+    for charm_dir in 'linked', 'chained', 'loop':
+        (root / charm_dir).mkdir()
+    (root / 'linked' / 'metadata.yaml').symlink_to('../metadata.yaml')
+    (root / 'linked' / 'charmcraft.yaml').symlink_to('../../outside.yaml')
+    (root / 'chained' / 'metadata.yaml').symlink_to('../linked/metadata.yaml')
+    (root / 'loop' / 'metadata.yaml').symlink_to('metadata.yaml')
+    git = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+    subprocess.run([*git, 'init', '--quiet', '--initial-branch=main'], cwd=root, check=True)
+    # let clones from this repo be partial, like clones from GitHub
+    subprocess.run([*git, 'config', 'uploadpack.allowFilter', 'true'], cwd=root, check=True)
+    subprocess.run([*git, 'add', '.'], cwd=root, check=True)
+    subprocess.run([*git, 'commit', '--quiet', '-m', 'one'], cwd=root, check=True)
+    return root
+
+
+@pytest.fixture
+def charm_clone(charm_repo: pathlib.Path, tmp_path: pathlib.Path) -> pathlib.Path:
+    clone = tmp_path / 'charm-clone'
+    cmd = ['git', 'clone', '--quiet', '--filter=blob:none', '--no-checkout']
+    subprocess.run([*cmd, charm_repo.as_uri(), clone], check=True)
+    return clone
+
+
+def _missing_objects(repo: pathlib.Path) -> set[str]:
+    cmd = ['git', 'rev-list', '--objects', '--missing=print', 'HEAD']
+    out = subprocess.run(cmd, cwd=repo, capture_output=True, text=True, check=True).stdout
+    return {line[1:] for line in out.splitlines() if line.startswith('?')}
+
+
+def test_read_files(charm_clone: pathlib.Path):
+    paths = [
+        'metadata.yaml',
+        'my charm/metadata.yaml',  # missing, with a space in the path
+        'my charm/charmcraft.yaml',
+        'tree/metadata.yaml',  # a directory
+        'linked/metadata.yaml',  # a symlink
+        'linked/charmcraft.yaml',  # a symlink out of the repo
+        'chained/metadata.yaml',  # a symlink to a symlink
+        'loop/metadata.yaml',  # a symlink to itself
+    ]
+    assert targets._read_files(charm_clone, paths) == {
+        'metadata.yaml': _METADATA_YAML,
+        'my charm/metadata.yaml': None,
+        'my charm/charmcraft.yaml': _CHARMCRAFT_YAML,
+        'tree/metadata.yaml': None,
+        'linked/metadata.yaml': _METADATA_YAML,
+        'linked/charmcraft.yaml': None,
+        'chained/metadata.yaml': _METADATA_YAML,
+        'loop/metadata.yaml': None,
+    }
+
+
+def test_prefetch(charm_clone: pathlib.Path):
+    entries = targets._ls_tree(charm_clone, ['metadata.yaml', 'my charm/charmcraft.yaml'])
+    oids = [oid for _, oid in entries.values()]
+    assert len(oids) == 2
+    assert _missing_objects(charm_clone).issuperset(oids)
+    targets._prefetch(charm_clone, oids)
+    assert _missing_objects(charm_clone).isdisjoint(oids)
+
+
+@pytest.mark.parametrize('charm_ref', [None, 'main'])
+def test_fetch_metadata(charm_repo: pathlib.Path, charm_ref: str | None):
+    metadata = targets._fetch_metadata(
+        charm_repo.as_uri(), charm_ref=charm_ref, charm_roots=['', 'my charm', 'linked']
+    )
+    assert metadata == {
+        'metadata.yaml': {'requires': {'db': {'interface': 'foo'}}},
+        'linked/metadata.yaml': {'requires': {'db': {'interface': 'foo'}}},
+        'my charm/charmcraft.yaml': {
+            'provides': {'a': {'interface': 'foo'}, 'b': {'interface': 'bar'}},
+        },
+    }
+
+
+def test_get_endpoints(charm_repo: pathlib.Path):
+    url = charm_repo.as_uri()
+    metadata = targets._fetch_metadata(url, charm_ref='main', charm_roots=['', 'my charm'])
+    root_source = (url, 'main', '')
+    charm_source = (url, 'main', 'my charm')
+    assert targets._get_endpoints('foo', 'requires', root_source, metadata) == ['db']
+    assert targets._get_endpoints('foo', 'provides', charm_source, metadata) == ['a']
+    assert targets._get_endpoints('bar', 'provides', charm_source, metadata) == ['b']
+    with pytest.raises(ValueError):  # the role isn't in this charm's metadata
+        targets._get_endpoints('foo', 'provides', root_source, metadata)
+    with pytest.raises(ValueError):  # the role has no endpoint for the interface
+        targets._get_endpoints('baz', 'provides', charm_source, metadata)
+
+
+def test_version_dirs(tmp_path: pathlib.Path):
+    versions = tmp_path / 'interface'
+    for name in 'v0', 'v1', 'v2', 'v10', 'v1-old', 'v2.md', 'vx', 'v':
+        (versions / name).mkdir(parents=True)
+    assert targets._version_dirs(tmp_path) == [versions / v for v in ('v0', 'v1', 'v2', 'v10')]
+
+
+def test_version_dirs_missing(tmp_path: pathlib.Path):
+    assert targets._version_dirs(tmp_path) == []
@@ -0,0 +1,79 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the shared git diff helper."""
+
+import json
+import pathlib
+import subprocess
+
+import _git_diff
+import pytest
+
+
+@pytest.fixture
+def repo(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    root = tmp_path / 'repo'
+    root.mkdir()
+    monkeypatch.chdir(root)
+    git = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+    subprocess.run([*git, 'init', '--quiet'], check=True)
+    (root / 'a.txt').write_text('a')
+    subprocess.run([*git, 'add', '.'], check=True)
+    subprocess.run([*git, 'commit', '--quiet', '-m', 'one'], check=True)
+    (root / 'a.txt').write_text('b')
+    return root
+
+
+def test_changed_paths_uncached(repo: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv('RUNNER_TEMP', raising=False)
+    assert _git_diff.changed_paths('HEAD') == ['a.txt']
+
+
+def test_changed_paths_cached(
+    repo: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv('RUNNER_TEMP', str(tmp_path))
+    git = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+    subprocess.run([*git, 'commit', '--quiet', '-am', 'two'], check=True)
+    assert _git_diff.changed_paths('HEAD~1') == ['a.txt']
+    cache_path = tmp_path / '.changed-cache.json'
+    cache = json.loads(cache_path.read_text())
+    assert list(cache.values()) == [['a.txt']]
+    # a second call reads the cache rather than diffing again
+    cache_path.write_text(json.dumps({key: ['cached.txt'] for key in cache}))
+    (repo / 'untracked.txt').write_text('')  # not part of the diff, so the cache is still used
+    assert _git_diff.changed_paths('HEAD~1') == ['cached.txt']
+
+
+def test_changed_paths_dirty_tree_not_cached(
+    repo: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv('RUNNER_TEMP', str(tmp_path))
+    assert _git_diff.changed_paths('HEAD') == ['a.txt']
+    assert not (tmp_path / '.changed-cache.json').exists()
+    (repo / 'b.txt').write_text('b')
+    subprocess.run(['git', 'add', 'b.txt'], check=True)
+    assert _git_diff.changed_paths('HEAD') == ['a.txt', 'b.txt']
+
+
+def test_changed_paths_lists_both_sides_of_a_move(
+    repo: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.delenv('RUNNER_TEMP', raising=False)
+    subprocess.run(['git', 'checkout', '--quiet', 'a.txt'], check=True)
+    subprocess.run(['git', 'mv', 'a.txt', 'ä.txt'], check=True)
+    assert sorted(_git_diff.changed_paths('HEAD')) == ['a.txt', 'ä.txt']
@@ -0,0 +1,195 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ruff: noqa: D103 (function docstrings)
+
+"""Unit tests for the ls script."""
+
+import pathlib
+import subprocess
+import tarfile
+import typing
+from unittest.mock import patch
+
+import ls
+import pytest
+
+_PROJECT = '[project]\nname = "charmlibs-foo"\n'
+_DYNAMIC = _PROJECT + 'dynamic = ["version"]\n'
+
+
+@pytest.mark.parametrize(
+    ('pyproject_toml', 'files'),
+    [
+        (_PROJECT + 'version = "1.2.3"\n', {}),
+        (
+            _DYNAMIC + '[tool.hatch.version]\npath = "src/foo/_version.py"\n',
+            {'src/foo/_version.py': "# comment\n__version__ = '1.2.3'\n"},
+        ),
+        (
+            _DYNAMIC + '[tool.setuptools.dynamic]\nversion = {file = ["VERSION.txt"]}\n',
+            {'VERSION.txt': '1.2.3\n'},
+        ),
+        (
+            _DYNAMIC + '[tool.setuptools.dynamic]\nversion = {attr = "foo.__version__"}\n',
+            {'src/foo/__init__.py': "import os\n__version__ = '1.2.3'\n"},
+        ),
+    ],
+)
+def test_read_package_version(tmp_path: pathlib.Path, pyproject_toml: str, files: dict[str, str]):
+    package = tmp_path / 'foo'
+    package.mkdir()
+    (package / 'pyproject.toml').write_text(pyproject_toml)
+    for name, content in files.items():
+        (package / name).parent.mkdir(parents=True, exist_ok=True)
+        (package / name).write_text(content)
+    with patch('subprocess.check_output') as check_output:
+        assert ls._get_package_version(pathlib.Path('foo'), root=tmp_path) == '1.2.3'
+    check_output.assert_not_called()
+
+
+def test_package_version_is_normalized(tmp_path: pathlib.Path):
+    package = tmp_path / 'foo'
+    package.mkdir()
+    (package / 'pyproject.toml').write_text(_PROJECT + 'version = "1.2.3-Alpha1"\n')
+    assert ls._get_package_version(pathlib.Path('foo'), root=tmp_path) == '1.2.3a1'
+
+
+def test_lowercase_dirs(tmp_path: pathlib.Path):
+    for name in 'bar', 'Foo', '_baz', 'target':
+        (tmp_path / name).mkdir()
+    (tmp_path / 'file').touch()
+    (tmp_path / 'linked').symlink_to('target')
+    (tmp_path / 'dangling').symlink_to('missing')
+    assert sorted(ls._lowercase_dirs(tmp_path)) == ['bar', 'linked', 'target']
+
+
+def test_lowercase_dirs_missing(tmp_path: pathlib.Path):
+    assert ls._lowercase_dirs(tmp_path / 'interfaces') == []
+
+
+def test_package_version_falls_back_to_uv(tmp_path: pathlib.Path):
+    package = tmp_path / 'foo'
+    package.mkdir()
+    (package / 'pyproject.toml').write_text(_DYNAMIC + '[tool.hatch.version]\nsource = "vcs"\n')
+    with patch('subprocess.check_output', return_value='1.2.3\n') as check_output:
+        assert ls._get_package_version(pathlib.Path('foo'), root=tmp_path) == '1.2.3'
+    assert check_output.call_args.args[0][:2] == ['uv', 'run']
+
+
+@pytest.fixture
+def repo(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Make a repo with packages foo and bar, and return the ref of its first commit.
+
+    The first commit is followed by a second one that changes foo, which is checked out.
+    """
+    root = tmp_path / 'repo'
+    for path in 'foo/src/foo.py', 'foo/tests/test_foo.py', 'foo/docs/index.md', 'bar/bar.py':
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text('one')
+    monkeypatch.chdir(root)
+    monkeypatch.setattr(ls, '_REPO_ROOT', root)
+    git = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+    subprocess.run([*git, 'init', '--quiet'], check=True)
+    subprocess.run([*git, 'add', '.'], check=True)
+    subprocess.run([*git, 'commit', '--quiet', '-m', 'one'], check=True)
+    ref = subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    (root / 'foo' / 'src' / 'foo.py').write_text('two')
+    subprocess.run([*git, 'commit', '--quiet', '--all', '-m', 'two'], check=True)
+    return ref
+
+
+def _read_tree(root: pathlib.Path) -> dict[str, str]:
+    return {p.relative_to(root).as_posix(): p.read_text() for p in root.rglob('*') if p.is_file()}
+
+
+def test_snapshot_repo(repo: str):
+    with ls._snapshot_repo(repo) as root:
+        assert root != ls._REPO_ROOT
+        assert _read_tree(root) == {
+            'foo/src/foo.py': 'one',
+            'foo/tests/test_foo.py': 'one',
+            'foo/docs/index.md': 'one',
+            'bar/bar.py': 'one',
+        }
+    assert not root.exists()
+
+
+def test_snapshot_repo_paths(repo: str):
+    paths = [pathlib.Path('foo'), pathlib.Path('baz')]  # baz doesn't exist at the ref
+    with ls._snapshot_repo(repo, paths=paths, exclude=('tests', 'docs')) as root:
+        assert _read_tree(root) == {'foo/src/foo.py': 'one'}
+
+
+def test_snapshot_repo_no_existing_paths(repo: str):
+    with ls._snapshot_repo(repo, paths=[pathlib.Path('baz')]) as root:
+        assert _read_tree(root) == {}
+
+
+def test_snapshot_repo_git_archive_fails(repo: str):
+    with (
+        patch.object(ls, '_is_clean_checkout', return_value=False),
+        pytest.raises(subprocess.CalledProcessError),
+        ls._snapshot_repo('no-such-ref'),
+    ):
+        pass
+
+
+def test_snapshot_repo_refuses_unsafe_members(repo: str, tmp_path: pathlib.Path):
+    archive = tmp_path / 'unsafe.tar'
+    with tarfile.open(archive, 'w') as tar:
+        tar.add(tmp_path / 'repo' / 'bar' / 'bar.py', arcname='../outside.py')
+    popen = subprocess.Popen
+
+    def cat_archive(cmd: list[str], **kwargs: typing.Any) -> subprocess.Popen[bytes]:
+        del cmd, kwargs  # stream the unsafe archive instead of running git archive
+        return popen(['cat', archive], stdout=subprocess.PIPE)
+
+    with (
+        patch.object(ls, '_is_clean_checkout', return_value=False),
+        patch.object(ls.subprocess, 'Popen', cat_archive),
+        pytest.raises(tarfile.OutsideDestinationError),
+        ls._snapshot_repo(repo),
+    ):
+        pass
+    assert not (tmp_path / 'outside.py').exists()
+
+
+def test_is_clean_checkout(repo: str):
+    head = subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    assert ls._is_clean_checkout('HEAD')
+    assert ls._is_clean_checkout(head)
+    assert not ls._is_clean_checkout(repo)
+
+
+@pytest.mark.parametrize('path', ['foo/src/foo.py', 'foo/src/new.py', 'new.py'])
+def test_is_clean_checkout_dirty(repo: str, path: str):
+    (ls._REPO_ROOT / path).write_text('dirty')  # modified or untracked
+    assert not ls._is_clean_checkout('HEAD')
+
+
+def test_snapshot_repo_clean_head_is_repo_root(repo: str):
+    with ls._snapshot_repo('HEAD', paths=[pathlib.Path('foo')]) as root:
+        assert root == ls._REPO_ROOT
+
+
+def test_snapshot_repo_dirty_head_is_snapshot(repo: str):
+    (ls._REPO_ROOT / 'foo' / 'src' / 'new.py').write_text('untracked')
+    with ls._snapshot_repo('HEAD', paths=[pathlib.Path('foo')]) as root:
+        assert root != ls._REPO_ROOT
+        assert _read_tree(root) == {
+            'foo/src/foo.py': 'two',
+            'foo/tests/test_foo.py': 'one',
+            'foo/docs/index.md': 'one',
+        }